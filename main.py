@@ -9,21 +9,26 @@ Installation: pip install discord.py python-dotenv
 # ========================================
 # IMPORTS
 # ========================================
+import io
 import os
 import sys
 import csv
 import json
+import marshal
+import random
+import asyncio
 import logging
-import subprocess
+import threading
 import time
+import unicodedata
 from datetime import datetime, timedelta
 from pathlib import Path
-from collections import defaultdict
+from collections import Counter, deque, OrderedDict
 from typing import Optional
 
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 from dotenv import load_dotenv
 
 
@@ -32,13 +37,16 @@ BASE_DIR = Path(__file__).parent
 COMMANDS_CSV = BASE_DIR / "commands.csv"
 LOGS_DIR = BASE_DIR / "logs"
 LANG_DIR = BASE_DIR / "languages"
+LANG_CACHE_DIR = LANG_DIR / ".cache"
 WARN_FILE = BASE_DIR / "warns.csv"
+BANNED_WORDS_CSV = BASE_DIR / "banned_words.csv"
 
 # Créer les dossiers/fichiers si nécessaires
 LOGS_DIR.mkdir(exist_ok=True)
 LANG_DIR.mkdir(exist_ok=True)
 COMMANDS_CSV.touch(exist_ok=True)
 WARN_FILE.touch(exist_ok=True)
+BANNED_WORDS_CSV.touch(exist_ok=True)
 
 VERSION = "v.6.0.0 - 2025-10-25"
 AUTOR = "Trotroni"
@@ -74,17 +82,24 @@ ADMIN_ROLE_ID = os.getenv("ADMIN_ROLE_ID")
 DEFAULT_LANGUAGE = os.getenv("DEFAULT_LANGUAGE", "fr")
 ephemeral_env = os.getenv("EPHEMERAL_GLOBAL", "true").lower()
 EPHEMERAL_GLOBAL = ephemeral_env == "true"
-
-if not DISCORD_TOKEN:
+low_memory_env = os.getenv("LOW_MEMORY", "false").lower()
+LOW_MEMORY = low_memory_env == "true"
+lang_cache_limit_env = os.getenv("LANG_CACHE_LIMIT", "2" if LOW_MEMORY else "8")
+antiraid_joins_env = os.getenv("ANTIRAID_JOINS", "false").lower()
+ANTIRAID_JOINS = antiraid_joins_env == "true"
+# Le benchmark de l'automodération tourne hors ligne : identifiants Discord inutiles
+BENCH_AUTOMOD = "--bench-automod" in sys.argv
+
+if not DISCORD_TOKEN and not BENCH_AUTOMOD:
     logger.error("❌ DISCORD_TOKEN manquant dans les fichiers .env")
     raise ValueError("❌ DISCORD_TOKEN manquant dans les fichiers .env")
-elif not GUILD_ID:
+elif not GUILD_ID and not BENCH_AUTOMOD:
     logger.error("❌ GUILD_ID manquant dans les fichiers .env")
     raise ValueError("❌ GUILD_ID manquant dans les fichiers .env")
-elif not CHANNEL_ID_NOTIF:
+elif not CHANNEL_ID_NOTIF and not BENCH_AUTOMOD:
     logger.error("❌ CHANNEL_ID_NOTIF manquant dans les fichiers .env")
     raise ValueError("❌ CHANNEL_ID_NOTIF manquant dans les fichiers .env")
-elif not ADMIN_ROLE_ID:
+elif not ADMIN_ROLE_ID and not BENCH_AUTOMOD:
     logger.error("❌ ADMIN_ROLE_ID manquant dans les fichiers .env")
     raise ValueError("❌ ADMIN_ROLE_ID manquant dans les fichiers .env")
 elif not DEFAULT_LANGUAGE:
@@ -93,43 +108,124 @@ elif not DEFAULT_LANGUAGE:
 elif ephemeral_env not in ["true", "false"]:
     logger.error("❌ EPHEMERAL_GLOBAL doit être 'true' ou 'false'") 
     raise ValueError("❌ EPHEMERAL_GLOBAL doit être 'true' ou 'false'")
+elif low_memory_env not in ["true", "false"]:
+    logger.error("❌ LOW_MEMORY doit être 'true' ou 'false'")
+    raise ValueError("❌ LOW_MEMORY doit être 'true' ou 'false'")
+elif not lang_cache_limit_env.isdigit() or int(lang_cache_limit_env) < 1:
+    logger.error("❌ LANG_CACHE_LIMIT doit être un entier positif")
+    raise ValueError("❌ LANG_CACHE_LIMIT doit être un entier positif")
+elif antiraid_joins_env not in ["true", "false"]:
+    logger.error("❌ ANTIRAID_JOINS doit être 'true' ou 'false'")
+    raise ValueError("❌ ANTIRAID_JOINS doit être 'true' ou 'false'")
+
+LANG_CACHE_LIMIT = int(lang_cache_limit_env)
+
+# Bornes des structures en mémoire du bot (plus serrées en mode basse mémoire)
+USER_PREFERENCES_MAX = 10000 if LOW_MEMORY else 100000
+COOLDOWN_MAX_ENTRIES = 1000 if LOW_MEMORY else 10000
 
-logger.info(f"✅ Configuration chargée: GUILD_ID={GUILD_ID}, CHANNEL_ID_NOTIF={CHANNEL_ID_NOTIF}, ADMIN_ROLE_ID={ADMIN_ROLE_ID}, DEFAULT_LANGUAGE={DEFAULT_LANGUAGE}, EPHEMERAL_GLOBAL={EPHEMERAL_GLOBAL}")
+logger.info(f"✅ Configuration chargée: GUILD_ID={GUILD_ID}, CHANNEL_ID_NOTIF={CHANNEL_ID_NOTIF}, ADMIN_ROLE_ID={ADMIN_ROLE_ID}, DEFAULT_LANGUAGE={DEFAULT_LANGUAGE}, EPHEMERAL_GLOBAL={EPHEMERAL_GLOBAL}, LOW_MEMORY={LOW_MEMORY}, LANG_CACHE_LIMIT={LANG_CACHE_LIMIT}, ANTIRAID_JOINS={ANTIRAID_JOINS}")
 
 # ========================================
 # GESTION DES LANGUES
 # ========================================
 class LanguageManager:
-    """Gestionnaire de traductions multilingues"""
-    def __init__(self):
-        self.translations = {}
+    """Gestionnaire de traductions multilingues (chargement à la demande)"""
+    def __init__(self, max_loaded: int = LANG_CACHE_LIMIT):
+        self.translations = OrderedDict()  # langues en mémoire, de la moins à la plus récemment utilisée
         self.available_languages = []
-        self.user_preferences = {}
+        self.language_names = {}
+        self.user_preferences = OrderedDict()  # bornée à USER_PREFERENCES_MAX, la plus ancienne est oubliée
+        self.max_loaded = max_loaded
 
     def load_languages(self):
+        """Recense les fichiers de langue ; leur contenu n'est lu qu'au premier usage"""
         self.translations.clear()
-        self.available_languages.clear()
-        files = list(LANG_DIR.glob("*.json"))
-        if not files:
+        self.language_names.clear()
+        self.available_languages = sorted(file.stem for file in LANG_DIR.glob("*.json"))
+        if not self.available_languages:
             logger.error(f"❌ Aucun fichier de langue dans {LANG_DIR}")
             raise FileNotFoundError("Aucun fichier de traduction")
-        for file in files:
-            lang_code = file.stem
-            try:
-                with open(file, 'r', encoding='utf-8') as f:
-                    self.translations[lang_code] = json.load(f)
-                    self.available_languages.append(lang_code)
-                logger.info(f"✅ Langue chargée : {lang_code}")
-            except Exception as e:
-                logger.error(f"❌ Erreur chargement {file}: {e}")
-        if not self.available_languages:
+        logger.info(f"✅ Langues disponibles : {', '.join(self.available_languages)}")
+        if DEFAULT_LANGUAGE not in self.available_languages:
+            logger.warning(f"⚠️ Langue par défaut '{DEFAULT_LANGUAGE}' introuvable dans {LANG_DIR}")
+        if self._bundle(DEFAULT_LANGUAGE) is None and not any(self._bundle(code) for code in self.available_languages):
             raise ValueError("Aucune langue valide chargée")
 
+    def _bundle(self, lang_code: str) -> Optional[dict]:
+        bundle = self.translations.get(lang_code)
+        if bundle is not None:
+            self.translations.move_to_end(lang_code)
+            return bundle
+        if lang_code not in self.available_languages:
+            return None
+        bundle = self._load_bundle(lang_code)
+        if bundle is None:
+            return None
+        self.translations[lang_code] = bundle
+        self.language_names[lang_code] = bundle.get("language_name", lang_code)
+        self._evict(keep=lang_code)
+        return bundle
+
+    def _evict(self, keep: str):
+        # La langue par défaut et celle qui vient d'être chargée restent toujours en mémoire
+        while len(self.translations) > self.max_loaded:
+            victim = next((code for code in self.translations if code not in (DEFAULT_LANGUAGE, keep)), None)
+            if victim is None:
+                return
+            del self.translations[victim]
+            logger.debug(f"Langue déchargée : {victim}")
+
+    def _load_bundle(self, lang_code: str) -> Optional[dict]:
+        """Lit le cache binaire si à jour, sinon analyse et valide le JSON puis régénère le cache"""
+        source = LANG_DIR / f"{lang_code}.json"
+        cache = LANG_CACHE_DIR / f"{lang_code}.marshal"
+        try:
+            stat = source.stat()
+        except OSError as e:
+            logger.error(f"❌ Erreur chargement {source}: {e}")
+            return None
+        stamp = (marshal.version, stat.st_mtime_ns, stat.st_size)
+        try:
+            with open(cache, 'rb') as f:
+                cached_stamp, bundle = marshal.load(f)
+            if cached_stamp == stamp:
+                return bundle
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
+
+        try:
+            with open(source, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if not isinstance(data, dict):
+                raise ValueError("le fichier doit contenir un objet JSON")
+            bundle = {k: v for k, v in data.items() if isinstance(v, str)}
+            for key in data.keys() - bundle.keys():
+                logger.warning(f"⚠️ Clé '{key}' ignorée dans {source.name} : valeur non textuelle")
+        except Exception as e:
+            logger.error(f"❌ Erreur chargement {source}: {e}")
+            return None
+
+        try:
+            LANG_CACHE_DIR.mkdir(exist_ok=True)
+            tmp = cache.with_suffix(".tmp")
+            with open(tmp, 'wb') as f:
+                marshal.dump((stamp, bundle), f)
+            os.replace(tmp, cache)
+        except OSError as e:
+            logger.warning(f"⚠️ Impossible d'écrire le cache de langue {cache}: {e}")
+        logger.info(f"✅ Langue chargée : {lang_code}")
+        return bundle
+
     def get(self, key: str, user_id: int = None, **kwargs) -> str:
-        lang = self.user_preferences.get(user_id, DEFAULT_LANGUAGE)
-        if lang not in self.translations:
+        lang = self.user_preferences.get(user_id)
+        if lang is None:
             lang = DEFAULT_LANGUAGE
-        translation = self.translations.get(lang, {}).get(key, f"[{key}]")
+        else:
+            # LRU : un utilisateur actif n'est pas oublié avant un inactif
+            self.user_preferences.move_to_end(user_id)
+        bundle = self._bundle(lang) or self._bundle(DEFAULT_LANGUAGE) or {}
+        translation = bundle.get(key, f"[{key}]")
         try:
             return translation.format(**kwargs)
         except KeyError as e:
@@ -137,13 +233,20 @@ class LanguageManager:
             return translation
 
     def set_user_language(self, user_id: int, language: str) -> bool:
-        if language in self.available_languages:
+        if language in self.available_languages and self._bundle(language) is not None:
+            self.user_preferences.pop(user_id, None)
             self.user_preferences[user_id] = language
+            while len(self.user_preferences) > USER_PREFERENCES_MAX:
+                self.user_preferences.popitem(last=False)
             return True
         return False
 
     def get_language_name(self, lang_code: str) -> str:
-        return self.translations.get(lang_code, {}).get("language_name", lang_code)
+        if lang_code not in self.language_names and lang_code in self.available_languages:
+            # Lecture sans passer par le LRU : lister les langues ne doit pas évincer celles en usage
+            bundle = self.translations.get(lang_code) or self._load_bundle(lang_code) or {}
+            self.language_names[lang_code] = bundle.get("language_name", lang_code)
+        return self.language_names.get(lang_code, lang_code)
 
 lang_manager = LanguageManager()
 
@@ -153,10 +256,21 @@ lang_manager = LanguageManager()
 intents = discord.Intents.default()
 intents.message_content = True
 intents.guilds = True
-
-bot = commands.Bot(command_prefix="/", intents=intents, help_command=None)
+# Intent privilégié (à activer aussi dans le portail développeur) : requis pour on_member_join
+intents.members = ANTIRAID_JOINS
+
+if LOW_MEMORY:
+    # Pas de cache de messages, aucun membre gardé en cache ni chargé au démarrage
+    bot = commands.Bot(
+        command_prefix="/", intents=intents, help_command=None,
+        max_messages=None,
+        member_cache_flags=discord.MemberCacheFlags.none(),
+        chunk_guilds_at_startup=False
+    )
+else:
+    bot = commands.Bot(command_prefix="/", intents=intents, help_command=None)
 custom_commands = {}
-command_cooldowns = defaultdict(lambda: 0)
+command_cooldowns = {}
 COMMAND_COOLDOWN = 3
 
 # ========================================
@@ -167,26 +281,44 @@ def t(key: str, interaction: discord.Interaction = None, **kwargs) -> str:
     return lang_manager.get(key, user_id, **kwargs)
 
 def is_admin(interaction: discord.Interaction) -> bool:
+    return is_admin_member(interaction.user)
+
+def is_admin_member(member: discord.Member) -> bool:
     if not ADMIN_ROLE_ID:
         logger.warning("⚠️ ADMIN_ROLE_ID non défini")
         return False
     try:
         admin_role_id = int(ADMIN_ROLE_ID)
-        if interaction.user.guild_permissions.administrator:
+        if member.guild_permissions.administrator:
             return True
-        return any(role.id == admin_role_id for role in interaction.user.roles)
+        return any(role.id == admin_role_id for role in member.roles)
     except ValueError:
         logger.error(f"❌ ADMIN_ROLE_ID invalide : {ADMIN_ROLE_ID}")
         return False
 
 async def check_command_cooldown(user_id: int, channel) -> bool:
     now = time.time()
-    if now < command_cooldowns[user_id]:
-        await channel.send(f"⏱️ Cooldown actif ({command_cooldowns[user_id]-now:.1f}s restant)", delete_after=3)
+    until = command_cooldowns.get(user_id, 0)
+    if now < until:
+        await channel.send(f"⏱️ Cooldown actif ({until-now:.1f}s restant)", delete_after=3)
         return False
+    if len(command_cooldowns) >= COOLDOWN_MAX_ENTRIES:
+        for uid in [uid for uid, expiry in command_cooldowns.items() if expiry <= now]:
+            del command_cooldowns[uid]
     command_cooldowns[user_id] = now + COMMAND_COOLDOWN
     return True
 
+async def notify_staff(embed: discord.Embed):
+    """Envoie une alerte dans le salon CHANNEL_ID_NOTIF"""
+    try:
+        channel = bot.get_channel(int(CHANNEL_ID_NOTIF))
+        if channel:
+            await channel.send(embed=embed)
+        else:
+            logger.warning("⚠️ CHANNEL_ID_NOTIF introuvable ou non valide.")
+    except Exception as e:
+        logger.error(f"❌ Impossible d'envoyer l'alerte au staff : {e}")
+
 def get_ephemeral(interaction: discord.Interaction, default: bool = True) -> bool:
     """Renvoie True si le message doit être éphémère."""
     return EPHEMERAL_GLOBAL if interaction else default
@@ -250,6 +382,300 @@ def save_warns(warns):
 
 warns_data = load_warns()
 
+def add_warn(uid: int, reason: str) -> int:
+    """Ajoute un warn à l'utilisateur et renvoie son nouveau total"""
+    warns_data.setdefault(uid, {"count": 0, "reasons": []})
+    warns_data[uid]["count"] += 1
+    warns_data[uid]["reasons"].append(reason)
+    save_warns(warns_data)
+    return warns_data[uid]["count"]
+
+async def apply_timeout(member: discord.Member, seconds: int, reason: str = None) -> bool:
+    """Exclut temporairement un membre (timeout Discord)"""
+    try:
+        await member.edit(timed_out_until=discord.utils.utcnow() + timedelta(seconds=seconds), reason=reason)
+        return True
+    except Exception as e:
+        logger.error(f"Erreur kick temporaire: {e}")
+        return False
+
+# ========================================
+# AUTOMODÉRATION (MOTS INTERDITS)
+# ========================================
+AUTOMOD_RELOAD_INTERVAL = 30
+
+def normalize_text(text: str) -> str:
+    """Minuscules, sans accents ni formes de compatibilité (é -> e, ﬁ -> fi)"""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+class AhoCorasick:
+    """Automate multi-motifs : un seul passage sur le texte quel que soit le nombre de motifs"""
+    def __init__(self, patterns: dict):
+        # patterns : {motif normalisé: raison}
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [()]
+        self.size = 0
+        for pattern, reason in patterns.items():
+            if pattern:
+                self._add(pattern, reason)
+        self._build()
+
+    def __len__(self):
+        return self.size
+
+    def _add(self, pattern: str, reason: str):
+        state = 0
+        for char in pattern:
+            nxt = self.goto[state].get(char)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[state][char] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(())
+            state = nxt
+        self.output[state] = ((pattern, reason),)
+        self.size += 1
+
+    def _build(self):
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for char, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[nxt] = self.goto[fallback].get(char, 0)
+                self.output[nxt] = self.output[nxt] + self.output[self.fail[nxt]]
+
+    def search(self, text: str):
+        """Renvoie le premier (motif, raison) trouvé comme mot entier dans le texte, ou None"""
+        goto, fail, output = self.goto, self.fail, self.output
+        state = 0
+        for i, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for pattern, reason in output[state]:
+                begin = i - len(pattern)
+                end = i + 1
+                if (begin < 0 or not text[begin].isalnum()) and (end >= len(text) or not text[end].isalnum()):
+                    return pattern, reason
+        return None
+
+class AutoModFilter:
+    """Filtre de mots interdits chargé depuis banned_words.csv (mot[,raison])"""
+    def __init__(self, path: Path):
+        self.path = path
+        self.automaton = AhoCorasick({})
+        self.mtime = None
+
+    def _read_patterns(self) -> dict:
+        patterns = {}
+        with open(self.path, 'r', encoding='utf-8', newline="") as f:
+            for row in csv.reader(f):
+                if row and row[0].strip():
+                    pattern = " ".join(normalize_text(row[0]).split())
+                    reason = row[1].strip() if len(row) >= 2 and row[1].strip() else f"Mot interdit : {row[0].strip()}"
+                    patterns[pattern] = reason
+        return patterns
+
+    def _compile(self) -> AhoCorasick:
+        return AhoCorasick(self._read_patterns())
+
+    def load(self):
+        """Chargement synchrone (démarrage)"""
+        try:
+            self.mtime = self.path.stat().st_mtime_ns
+            self.automaton = self._compile()
+            logger.info(f"✅ {len(self.automaton)} mots interdits chargés")
+        except Exception as e:
+            logger.error(f"❌ Erreur chargement mots interdits : {e}")
+
+    async def reload_if_changed(self):
+        """Recompile l'automate dans un thread si le CSV a changé, puis l'échange d'un bloc"""
+        try:
+            mtime = self.path.stat().st_mtime_ns
+            if mtime == self.mtime:
+                return
+            automaton = await asyncio.to_thread(self._compile)
+            self.automaton, self.mtime = automaton, mtime
+            logger.info(f"✅ Mots interdits rechargés : {len(automaton)} motif(s)")
+        except Exception as e:
+            logger.error(f"❌ Erreur rechargement mots interdits : {e}")
+
+    def check(self, content: str):
+        if not content:
+            return None
+        return self.automaton.search(" ".join(normalize_text(content).split()))
+
+automod = AutoModFilter(BANNED_WORDS_CSV)
+automod.load()
+
+@tasks.loop(seconds=AUTOMOD_RELOAD_INTERVAL)
+async def automod_watch():
+    await automod.reload_if_changed()
+
+async def handle_automod_hit(message: discord.Message, pattern: str, reason: str):
+    member = message.author
+    logger.info(f"🛡️ Automod : {member} ({member.id}) a utilisé '{pattern}' dans #{message.channel}")
+    try:
+        await message.delete()
+    except Exception as e:
+        logger.error(f"Erreur suppression message automod: {e}")
+    count = add_warn(member.id, reason)
+    try:
+        await message.channel.send(f"{member.mention} reçoit un warn ({reason}). Total: {count}", delete_after=10)
+    except Exception as e:
+        logger.error(f"Erreur en envoyant le message: {e}")
+    if count >= WARN_LIMIT and isinstance(member, discord.Member):
+        await apply_timeout(member, KICK_DURATION, reason)
+
+# ========================================
+# ANTI-RAID / ANTI-FLOOD
+# ========================================
+FLOOD_WINDOW = 10              # secondes
+FLOOD_MAX_MESSAGES = 8         # messages par utilisateur dans la fenêtre
+FLOOD_MAX_DUPLICATES = 4       # messages identiques consécutifs dans la fenêtre
+FLOOD_MAX_MENTIONS = 10        # mentions cumulées dans la fenêtre
+CHANNEL_FLOOD_MAX_MESSAGES = 40
+JOIN_WINDOW = 30
+JOIN_BURST_MAX = 10
+FLOOD_TIMEOUT = 300
+ACTIVITY_IDLE_TTL = 120        # secondes d'inactivité avant éviction
+ACTIVITY_MAX_ENTRIES = 10000 if LOW_MEMORY else 50000
+
+class UserActivity:
+    """Fenêtres glissantes d'un utilisateur, chacune dans un buffer circulaire de taille fixe"""
+    __slots__ = ("last_seen", "times", "contents", "mentions")
+
+    def __init__(self):
+        self.last_seen = 0.0
+        self.times = deque(maxlen=FLOOD_MAX_MESSAGES)
+        self.contents = deque(maxlen=FLOOD_MAX_DUPLICATES)
+        self.mentions = deque(maxlen=FLOOD_MAX_MESSAGES)
+
+    def clear(self):
+        self.times.clear()
+        self.contents.clear()
+        self.mentions.clear()
+
+def window_full(buffer: deque, now: float, window: float = FLOOD_WINDOW) -> bool:
+    """Vrai si le buffer est plein et que son plus ancien élément est encore dans la fenêtre"""
+    if len(buffer) < buffer.maxlen:
+        return False
+    oldest = buffer[0][0] if isinstance(buffer[0], tuple) else buffer[0]
+    return now - oldest <= window
+
+class ActivityTracker:
+    """Table LRU bornée : les entrées inactives ou en surnombre sont évincées"""
+    def __init__(self, factory, idle_ttl: float = ACTIVITY_IDLE_TTL, max_entries: int = ACTIVITY_MAX_ENTRIES):
+        self.factory = factory
+        self.idle_ttl = idle_ttl
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key: int, now: float):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            entry = self.factory()
+        entry.last_seen = now
+        self.entries[key] = entry
+        self._evict(now)
+        return entry
+
+    def _evict(self, now: float):
+        # Les entrées sont rangées de la moins récemment active à la plus récente
+        while self.entries:
+            key, oldest = next(iter(self.entries.items()))
+            if now - oldest.last_seen <= self.idle_ttl and len(self.entries) <= self.max_entries:
+                break
+            del self.entries[key]
+
+class ChannelActivity:
+    __slots__ = ("last_seen", "times")
+
+    def __init__(self):
+        self.last_seen = 0.0
+        self.times = deque(maxlen=CHANNEL_FLOOD_MAX_MESSAGES)
+
+user_activity = ActivityTracker(UserActivity)
+channel_activity = ActivityTracker(ChannelActivity)
+recent_joins = deque(maxlen=JOIN_BURST_MAX)
+
+def check_flood(message: discord.Message) -> Optional[str]:
+    """Enregistre le message et renvoie la raison si un seuil utilisateur est dépassé"""
+    now = time.monotonic()
+    activity = user_activity.get(message.author.id, now)
+    activity.times.append(now)
+    if message.content:
+        activity.contents.append((now, hash(message.content)))
+    # @everyone/@here ne compte pas : il n'est effectif que pour les membres autorisés (staff)
+    activity.mentions.append((now, len(message.mentions) + len(message.role_mentions)))
+
+    reason = None
+    if window_full(activity.times, now):
+        reason = f"Flood : {FLOOD_MAX_MESSAGES} messages en moins de {FLOOD_WINDOW}s"
+    elif window_full(activity.contents, now) and len({h for _, h in activity.contents}) == 1:
+        reason = f"Spam : {FLOOD_MAX_DUPLICATES} messages identiques"
+    elif sum(count for ts, count in activity.mentions if now - ts <= FLOOD_WINDOW) >= FLOOD_MAX_MENTIONS:
+        reason = f"Spam de mentions : {FLOOD_MAX_MENTIONS}+ mentions en moins de {FLOOD_WINDOW}s"
+    if reason:
+        activity.clear()
+    return reason
+
+def check_channel_flood(message: discord.Message) -> bool:
+    now = time.monotonic()
+    activity = channel_activity.get(message.channel.id, now)
+    activity.times.append(now)
+    if window_full(activity.times, now):
+        activity.times.clear()
+        return True
+    return False
+
+async def handle_flood(message: discord.Message, reason: str):
+    member = message.author
+    logger.warning(f"🚨 Anti-flood : {member} ({member.id}) dans #{message.channel} — {reason}")
+    await apply_timeout(member, FLOOD_TIMEOUT, reason)
+    embed = discord.Embed(title="🚨 Anti-flood", description=f"{member.mention} exclu {FLOOD_TIMEOUT}s", color=discord.Color.red())
+    embed.add_field(name="Raison", value=reason, inline=False)
+    embed.add_field(name="Salon", value=message.channel.mention, inline=True)
+    await notify_staff(embed)
+
+async def handle_channel_flood(message: discord.Message):
+    logger.warning(f"🚨 Anti-raid : activité anormale dans #{message.channel}")
+    embed = discord.Embed(
+        title="🚨 Anti-raid",
+        description=f"{CHANNEL_FLOOD_MAX_MESSAGES} messages en moins de {FLOOD_WINDOW}s dans {message.channel.mention}",
+        color=discord.Color.red()
+    )
+    await notify_staff(embed)
+
+def benchmark_automod(pattern_count: int = 5000, message_count: int = 20000):
+    """Mesure le débit du filtre (messages/seconde) : python main.py --bench-automod"""
+    rng = random.Random(42)
+    alphabet = "abcdefghijklmnopqrstuvwxyzéèàç"
+    def word(a, b):
+        return "".join(rng.choice(alphabet) for _ in range(rng.randint(a, b)))
+    patterns = {normalize_text(word(4, 10)): "bench" for _ in range(pattern_count)}
+    messages = [" ".join(word(2, 9) for _ in range(rng.randint(5, 40))) for _ in range(message_count)]
+
+    begin = time.perf_counter()
+    bench = AutoModFilter(BANNED_WORDS_CSV)
+    bench.automaton = AhoCorasick(patterns)
+    build_time = time.perf_counter() - begin
+
+    begin = time.perf_counter()
+    hits = sum(1 for content in messages if bench.check(content))
+    elapsed = time.perf_counter() - begin
+    print(f"Automate : {len(bench.automaton)} motifs compilés en {build_time * 1000:.1f} ms")
+    print(f"Débit : {message_count / elapsed:,.0f} messages/s ({hits} messages filtrés sur {message_count})")
+
 # ========================================
 # ÉVÉNEMENTS
 # ========================================
@@ -267,6 +693,9 @@ async def on_ready():
 
     load_custom_commands()
 
+    if not automod_watch.is_running():
+        automod_watch.start()
+
     try:
         if GUILD_ID:
             guild_id = int(GUILD_ID)
@@ -335,6 +764,22 @@ async def on_message(message):
     if message.author.bot:
         return
 
+    # Anti-flood / anti-raid (les administrateurs et le staff ne sont pas suivis)
+    if isinstance(message.author, discord.Member) and not is_admin_member(message.author):
+        if check_channel_flood(message):
+            await handle_channel_flood(message)
+        reason = check_flood(message)
+        if reason:
+            await handle_flood(message, reason)
+            return
+
+    # Automodération : mots interdits
+    if message.guild:
+        hit = automod.check(message.content)
+        if hit:
+            await handle_automod_hit(message, *hit)
+            return
+
     # DEBUG
     logger.debug("Message raw repr: %r", message.content)
     logger.debug("startswith('/') -> %s", message.content.startswith('/'))
@@ -362,6 +807,26 @@ async def on_message(message):
                 logger.info(f"Commande inconnue: {command_name}")
     await bot.process_commands(message)
 
+@bot.event
+async def on_member_join(member: discord.Member):
+    # Reçu uniquement si ANTIRAID_JOINS=true (intent members)
+    now = time.monotonic()
+    # Les membres sont gardés dans la fenêtre : le cache de membres peut être désactivé (LOW_MEMORY)
+    recent_joins.append((now, member))
+    if not window_full(recent_joins, now, JOIN_WINDOW):
+        return
+    joined = [target for _, target in recent_joins]
+    recent_joins.clear()
+    logger.warning(f"🚨 Anti-raid : {len(joined)} arrivées en moins de {JOIN_WINDOW}s sur {member.guild}")
+    for target in joined:
+        await apply_timeout(target, FLOOD_TIMEOUT, "Anti-raid : vague d'arrivées")
+    embed = discord.Embed(
+        title="🚨 Anti-raid",
+        description=f"{len(joined)} arrivées en moins de {JOIN_WINDOW}s — nouveaux membres exclus {FLOOD_TIMEOUT}s",
+        color=discord.Color.red()
+    )
+    embed.add_field(name="Membres", value=", ".join(target.mention for target in joined), inline=False)
+    await notify_staff(embed)
 
 # ========================================
 # COMMANDES SLASH
@@ -401,7 +866,7 @@ async def help_command(interaction: discord.Interaction):
     logger.info(f"L'utilisateur {user} a exécuté la commande {name}")
     embed = discord.Embed(title=t("help_title", interaction), color=discord.Color.blue())
     embed.add_field(name=t("help_system", interaction),
-                    value=f"🟢 `/ping`\n🟡 `/reboot`\n🟡 `/upgrade`\n🟡 `/bot_update`",
+                    value=f"🟢 `/ping`\n🟡 `/reboot`\n🟡 `/upgrade`\n🟡 `/bot_update`\n🟡 `/profile`\n🟡 `/memory`",
                     inline=False)
     embed.add_field(name=t("help_csv", interaction),
                     value=f"🟢 `/create`\n🟢 `/modif`\n🟢 `/delete`\n🟢 `/list`\n🟢 `/reload_commands`",
@@ -604,18 +1069,12 @@ async def warn_command(interaction: discord.Interaction, user: discord.Member, r
 )
         return
     uid = user.id
-    warns_data.setdefault(uid, {"count": 0, "reasons": []})
-    warns_data[uid]["count"] += 1
-    warns_data[uid]["reasons"].append(reason)
-    save_warns(warns_data)
-    await interaction.response.send_message(f"{user.mention} reçoit un warn ({reason}). Total: {warns_data[uid]['count']}", ephemeral=EPHEMERAL_GLOBAL
+    count = add_warn(uid, reason)
+    await interaction.response.send_message(f"{user.mention} reçoit un warn ({reason}). Total: {count}", ephemeral=EPHEMERAL_GLOBAL
 )
-    if warns_data[uid]["count"] >= WARN_LIMIT:
+    if count >= WARN_LIMIT:
         await interaction.channel.send(f"{user.mention} kick temporaire ({KICK_DURATION}s)")
-        try:
-            await user.edit(communication_disabled_until=datetime.utcnow()+timedelta(seconds=KICK_DURATION))
-        except Exception as e:
-            logger.error(f"Erreur kick temporaire: {e}")
+        await apply_timeout(user, KICK_DURATION, reason)
 
 @bot.tree.command(name="warns", description="Voir warns utilisateur")
 @app_commands.describe(user="Utilisateur")
@@ -684,26 +1143,172 @@ async def report_command(interaction: discord.Interaction, nombre: int, reason:
     )
 
 # --------- Logs ---------
+LOGS_TAIL_CHARS = 1900
+LOGS_FOLLOW_DURATION = 300      # secondes (le jeton d'interaction expire après 15 min)
+LOGS_FOLLOW_POLL = 1.0
+LOGS_FOLLOW_EDIT_INTERVAL = 3.0 # secondes minimum entre deux éditions d'un même message
+LOGS_FOLLOW_MAX_READ = 64 * 1024
+
+def latest_log_file() -> Optional[Path]:
+    log_files = sorted(LOGS_DIR.glob("bot_*.log"), reverse=True)
+    return log_files[0] if log_files else None
+
+def read_log_tail(path: Path, chars: int = LOGS_TAIL_CHARS) -> tuple:
+    """Lit uniquement la fin du fichier au lieu de le charger en entier.
+    Renvoie (texte, offset) : offset est la fin de la dernière ligne complète lue"""
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        begin = max(0, f.tell() - chars * 4)
+        f.seek(begin)
+        data = f.read()
+    end = data.rfind(b"\n") + 1
+    return data[:end].decode("utf-8", errors="replace")[-chars:], begin + end
+
+def read_log_range(path: Path, begin: int, end: int) -> bytes:
+    with open(path, 'rb') as f:
+        f.seek(begin)
+        return f.read(end - begin)
+
+def logs_embed(filename: str, content: str, status: str = "") -> discord.Embed:
+    return discord.Embed(title=f"📜 Logs Bot ({filename}){status}",
+                         description=f"```{content[-LOGS_TAIL_CHARS:]}```",
+                         color=discord.Color.green())
+
+class LogSubscriber:
+    """Un message /logs follow, mis à jour en place jusqu'à son échéance.
+    (path, offset) marque la fin de ce que le message affiche déjà"""
+    def __init__(self, message: discord.WebhookMessage, content: str, path: Path, offset: int, duration: float):
+        self.message = message
+        self.content = content
+        self.path = path
+        self.offset = offset
+        self.deadline = time.monotonic() + duration
+        self.last_edit = time.monotonic()
+        self.dirty = False
+
+    def accept(self, path: Path, start: int, data: bytes):
+        """Ajoute les octets [start, start + len(data)) de path, sans ce qui est déjà affiché"""
+        end = start + len(data)
+        if path == self.path:
+            if end <= self.offset:
+                return
+            if start < self.offset:
+                data = data[self.offset - start:]
+        self.path, self.offset = path, end
+        self.content = (self.content + data.decode("utf-8", errors="replace"))[-LOGS_TAIL_CHARS:]
+        self.dirty = True
+
+    async def flush(self, filename: str, final: bool = False) -> bool:
+        status = " — suivi terminé" if final else " — 🔴 en direct"
+        self.last_edit = time.monotonic()
+        self.dirty = False
+        try:
+            await self.message.edit(embed=logs_embed(filename, self.content, status))
+            return True
+        except Exception as e:
+            logger.error(f"Erreur mise à jour suivi des logs: {e}")
+            return False
+
+class LogFollower:
+    """Lecteur unique du log actif, partagé par tous les /logs follow en cours.
+    Ne lit que les octets ajoutés depuis le dernier passage et suit la rotation des fichiers."""
+    def __init__(self):
+        self.path = None
+        self.offset = 0
+        self.subscribers = []
+        self.task = None
+
+    def subscribe(self, subscriber: LogSubscriber):
+        if self.task is None:
+            # Premier abonné : la lecture reprend exactement où son instantané s'est arrêté
+            self.path, self.offset = subscriber.path, subscriber.offset
+            self.task = asyncio.create_task(self._run())
+        elif self.path == subscriber.path and self.offset > subscriber.offset:
+            # Le lecteur partagé a déjà consommé des lignes postérieures à l'instantané : on comble l'écart
+            begin = max(subscriber.offset, self.offset - LOGS_FOLLOW_MAX_READ)
+            subscriber.accept(self.path, begin, read_log_range(self.path, begin, self.offset))
+        self.subscribers.append(subscriber)
+
+    def _read_from(self, path: Path) -> list:
+        try:
+            size = path.stat().st_size
+        except FileNotFoundError:
+            return []
+        if size < self.offset:
+            # Fichier tronqué : on repart du début
+            self.offset = 0
+        if size - self.offset > LOGS_FOLLOW_MAX_READ:
+            self.offset = size - LOGS_FOLLOW_MAX_READ
+        if size == self.offset:
+            return []
+        start = self.offset
+        data = read_log_range(path, start, size)
+        # Ne consommer que des lignes complètes (évite de couper un caractère UTF-8)
+        end = data.rfind(b"\n") + 1
+        self.offset += end
+        return [(path, start, data[:end])] if end else []
+
+    def _read_new(self) -> list:
+        """[(fichier, offset de début, octets)] ajoutés depuis le dernier passage"""
+        latest = latest_log_file()
+        if latest is None:
+            return []
+        chunks = []
+        if latest != self.path:
+            # Rotation : fin de l'ancien fichier puis nouveau fichier depuis le début
+            chunks = self._read_from(self.path) if self.path else []
+            self.path, self.offset = latest, 0
+        return chunks + self._read_from(self.path)
+
+    async def _run(self):
+        try:
+            while self.subscribers:
+                chunks = await asyncio.to_thread(self._read_new)
+                now = time.monotonic()
+                filename = self.path.name if self.path else "?"
+                for subscriber in list(self.subscribers):
+                    for chunk in chunks:
+                        subscriber.accept(*chunk)
+                    if now >= subscriber.deadline:
+                        self.subscribers.remove(subscriber)
+                        await subscriber.flush(filename, final=True)
+                    elif subscriber.dirty and now - subscriber.last_edit >= LOGS_FOLLOW_EDIT_INTERVAL:
+                        if not await subscriber.flush(filename):
+                            self.subscribers.remove(subscriber)
+                await asyncio.sleep(LOGS_FOLLOW_POLL)
+        except Exception as e:
+            logger.error(f"Erreur suivi des logs: {e}")
+            self.subscribers.clear()
+        finally:
+            self.task = None
+            self.path = None
+
+log_follower = LogFollower()
+
 @bot.tree.command(name="logs", description="Affiche les derniers logs du bot")
-async def logs_command(interaction: discord.Interaction):
+@app_commands.describe(follow="Suivre les nouveaux logs en direct (admin)")
+async def logs_command(interaction: discord.Interaction, follow: bool = False):
     user = interaction.user
     name = interaction.command.name
     logger.info(f"L'utilisateur {user} a exécuté la commande {name}")
+    if follow and not is_admin(interaction):
+        await interaction.response.send_message("permission_denied", ephemeral=EPHEMERAL_GLOBAL
+)
+        return
     await interaction.response.defer(ephemeral=EPHEMERAL_GLOBAL
 )
     try:
-        log_files = sorted(LOGS_DIR.glob("bot_*.log"), reverse=True)
-        if not log_files:
+        latest_file = latest_log_file()
+        if latest_file is None:
             await interaction.followup.send("❌ Aucun fichier de log trouvé.", ephemeral=EPHEMERAL_GLOBAL
 )
             return
-        latest_file = log_files[0]
-        content = latest_file.read_text(encoding="utf-8")[-1900:]
-        embed = discord.Embed(title=f"📜 Logs Bot ({latest_file.name})",
-                              description=f"```{content}```",
-                              color=discord.Color.green())
-        await interaction.followup.send(embed=embed, ephemeral=EPHEMERAL_GLOBAL
+        content, offset = await asyncio.to_thread(read_log_tail, latest_file)
+        status = f" — 🔴 en direct ({LOGS_FOLLOW_DURATION // 60} min)" if follow else ""
+        message = await interaction.followup.send(embed=logs_embed(latest_file.name, content, status), ephemeral=EPHEMERAL_GLOBAL, wait=True
 )
+        if follow:
+            log_follower.subscribe(LogSubscriber(message, content, latest_file, offset, LOGS_FOLLOW_DURATION))
     except Exception as e:
         await interaction.followup.send(f"❌ Erreur lecture logs: {e}", ephemeral=EPHEMERAL_GLOBAL
 )
@@ -729,31 +1334,343 @@ async def reboot_command(interaction: discord.Interaction):
     await bot.close()
     os.execv(sys.executable, [sys.executable] + sys.argv)
 
+UPGRADE_TIMEOUT = 120
+UPGRADE_EDIT_INTERVAL = 1.5
+
+async def run_process(*cmd: str, on_output=None) -> tuple:
+    """Lance une commande sans bloquer la boucle ; on_output reçoit la sortie cumulée au fil de l'eau"""
+    proc = await asyncio.create_subprocess_exec(
+        *cmd, cwd=BASE_DIR, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT
+    )
+    output = ""
+    try:
+        while True:
+            line = await proc.stdout.readline()
+            if not line:
+                break
+            output += line.decode("utf-8", errors="replace")
+            if on_output:
+                await on_output(output)
+        await proc.wait()
+    except BaseException:
+        # Annulation, timeout ou erreur de on_output : ne jamais laisser le processus tourner seul
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        raise
+    return proc.returncode, output.strip()
+
+async def git_head() -> str:
+    code, output = await run_process("git", "rev-parse", "HEAD")
+    if code != 0:
+        raise RuntimeError(f"git rev-parse a échoué : {output}")
+    return output
+
+async def rollback_to(old_head: str) -> Optional[str]:
+    """Ramène HEAD sur old_head s'il a bougé ; renvoie la sortie de git si le retour échoue"""
+    try:
+        if await git_head() == old_head:
+            return None
+        code, output = await run_process("git", "reset", "--keep", old_head)
+    except Exception as e:
+        logger.error(f"❌ Retour à {old_head} impossible : {e}")
+        return str(e)
+    if code != 0:
+        logger.error("❌ Retour à %s impossible (code %s) :\n%s", old_head, code, output)
+        return output or f"git reset a échoué (code {code})"
+    logger.info("↩️ Retour à %s effectué", old_head[:7])
+    return None
+
 @bot.tree.command(name="upgrade", description="Met à jour le bot depuis Git")
 async def upgrade_command(interaction: discord.Interaction):
     user = interaction.user
     name = interaction.command.name
     logger.info(f"L'utilisateur {user} a exécuté la commande {name}")
-#    await interaction.response.send_message("🚧 Fonctionnalité en construction.", ephemeral=EPHEMERAL_GLOBAL)
 
     if not is_admin(interaction):
         await interaction.response.send_message("permission_denied", ephemeral=EPHEMERAL_GLOBAL
 )
         return
-    await interaction.response.send_message("⬆️ Mise à jour du bot en cours...", ephemeral=EPHEMERAL_GLOBAL
-)
+    await interaction.response.defer(ephemeral=EPHEMERAL_GLOBAL)
+    status = await interaction.followup.send(t("upgrade_updating", interaction), ephemeral=EPHEMERAL_GLOBAL, wait=True)
     logger.info("⬆️ Mise à jour demandée par %s", interaction.user)
+
+    last_edit = 0.0
+
+    async def show_progress(output: str):
+        # Limite les éditions pour respecter le rate limit Discord
+        nonlocal last_edit
+        now = time.monotonic()
+        if now - last_edit >= UPGRADE_EDIT_INTERVAL:
+            last_edit = now
+            try:
+                await status.edit(content=f"{t('upgrade_updating', interaction)}\n```\n{output[-1800:]}\n```")
+            except Exception as e:
+                # Un échec d'affichage (429, réseau) ne doit pas interrompre git pull
+                logger.warning(f"⚠️ Impossible d'afficher la progression de la mise à jour : {e}")
+
+    def rollback_note(error: Optional[str]) -> str:
+        if error is None:
+            return ""
+        return "\n" + t("upgrade_rollback_failed", interaction, commit=old_head[:7], output=error[-300:])
+
+    old_head = None
     try:
-        result = subprocess.run(["git", "pull"], capture_output=True, text=True)
-        output = result.stdout + "\n" + result.stderr
+        old_head = await git_head()
+        code, output = await asyncio.wait_for(
+            run_process("git", "pull", on_output=show_progress), timeout=UPGRADE_TIMEOUT
+        )
         logger.info("Git pull output:\n%s", output)
+        if code != 0:
+            note = rollback_note(await rollback_to(old_head))
+            await status.edit(content=t("upgrade_error", interaction, error=f"\n```\n{output[-1500:]}\n```") + note)
+            return
+
+        new_head = await git_head()
+        if new_head == old_head:
+            await status.edit(content=t("upgrade_up_to_date", interaction))
+            return
+
+        # Vérification avant redémarrage : le nouveau code doit compiler
+        code, check_output = await run_process(sys.executable, "-m", "compileall", "-q", "-l", str(BASE_DIR))
+        if code != 0:
+            logger.error("❌ Le nouveau code ne compile pas, retour à %s :\n%s", old_head, check_output)
+            note = rollback_note(await rollback_to(old_head))
+            await status.edit(content=t("upgrade_check_failed", interaction, commit=old_head[:7], output=check_output[-1200:]) + note)
+            return
+
+        await status.edit(content=t("upgrade_success", interaction, output=output[-1800:]))
+        logger.info("♻️ Redémarrage après mise à jour %s -> %s", old_head[:7], new_head[:7])
         await bot.close()
         os.execv(sys.executable, [sys.executable] + sys.argv)
+    except asyncio.TimeoutError:
+        logger.error("❌ Timeout lors de la mise à jour")
+        # git pull vient d'être tué : son verrou d'index est forcément orphelin
+        (BASE_DIR / ".git" / "index.lock").unlink(missing_ok=True)
+        note = rollback_note(await rollback_to(old_head))
+        await status.edit(content=t("upgrade_timeout", interaction) + note)
     except Exception as e:
         logger.error(f"Erreur lors de la mise à jour: {e}")
-        await interaction.followup.send(f"❌ Erreur mise à jour: {e}", ephemeral=EPHEMERAL_GLOBAL
+        note = rollback_note(await rollback_to(old_head)) if old_head is not None else ""
+        await status.edit(content=t("upgrade_error", interaction, error=e) + note)
+
+
+# --------- Profilage ---------
+PROFILE_MAX_SECONDS = 60
+PROFILE_INTERVAL = 0.005        # secondes entre deux échantillons
+PROFILE_LAG_TICK = 0.02         # période du moniteur de latence de la boucle
+PROFILE_SLOW_CALLBACK = 0.1     # secondes au-delà desquelles un callback bloque la boucle
+
+class SamplingProfiler:
+    """Échantillonne la pile du thread de la boucle asyncio depuis un thread dédié.
+    Rien n'est installé en dehors d'un profilage : aucun coût quand il est arrêté."""
+    def __init__(self, interval: float = PROFILE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()  # pile repliée -> nombre d'échantillons (hors attente)
+        self.samples = 0
+        self.idle = 0            # échantillons où la boucle attendait des événements
+        self.recent = deque(maxlen=int(PROFILE_MAX_SECONDS / interval))  # (horodatage, pile) des piles actives
+        self._lock = threading.Lock()
+        self._target = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._target = threading.get_ident()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            if frame is None:
+                continue
+            self.samples += 1
+            if frame.f_code.co_name == "select" and Path(frame.f_code.co_filename).name in ("selectors.py", "windows_events.py"):
+                self.idle += 1
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                frame = frame.f_back
+            collapsed = sys.intern(";".join(reversed(stack)))  # une seule copie par pile distincte
+            self.stacks[collapsed] += 1
+            with self._lock:
+                self.recent.append((time.monotonic(), collapsed))
+
+    def stack_between(self, begin: float, end: float) -> Optional[str]:
+        """Pile active la plus fréquente entre deux instants (time.monotonic)"""
+        with self._lock:
+            window = Counter(stack for ts, stack in self.recent if begin <= ts <= end)
+        return window.most_common(1)[0][0] if window else None
+
+    def collapsed(self) -> str:
+        """Format « pile repliée » (flamegraph.pl, speedscope)"""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+    def hot_functions(self) -> list:
+        """[(fonction, échantillons propres, échantillons cumulés)] triés par temps propre, attente exclue"""
+        own, total = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for func in set(frames):
+                total[func] += count
+        return sorted(((func, own[func], total[func]) for func in total), key=lambda x: (x[1], x[2]), reverse=True)
+
+async def monitor_loop_lag(profiler: SamplingProfiler, seconds: float) -> list:
+    """Mesure le retard de réveil d'un asyncio.sleep : un retard au-delà du seuil signale un callback bloquant.
+    Renvoie [(durée du blocage, pile échantillonnée pendant le blocage)]"""
+    blocks = []
+    stop_at = time.monotonic() + seconds
+    while time.monotonic() < stop_at:
+        before = time.monotonic()
+        await asyncio.sleep(PROFILE_LAG_TICK)
+        after = time.monotonic()
+        lag = after - before - PROFILE_LAG_TICK
+        if lag >= PROFILE_SLOW_CALLBACK:
+            blocks.append((lag, profiler.stack_between(before, after)))
+    return blocks
+
+active_profiler = None
+
+@bot.tree.command(name="profile", description="Profile le bot pendant quelques secondes (admin)")
+@app_commands.describe(seconds=f"Durée du profilage (1-{PROFILE_MAX_SECONDS})")
+async def profile_command(interaction: discord.Interaction, seconds: int = 10):
+    global active_profiler
+    user = interaction.user
+    name = interaction.command.name
+    logger.info(f"L'utilisateur {user} a exécuté la commande {name}")
+    if not is_admin(interaction):
+        await interaction.response.send_message("permission_denied", ephemeral=EPHEMERAL_GLOBAL
 )
+        return
+    if active_profiler is not None:
+        await interaction.response.send_message("⚠️ Un profilage est déjà en cours.", ephemeral=EPHEMERAL_GLOBAL)
+        return
+    seconds = max(1, min(seconds, PROFILE_MAX_SECONDS))
+    await interaction.response.defer(ephemeral=EPHEMERAL_GLOBAL)
+
+    profiler = SamplingProfiler()
+    active_profiler = profiler
+    try:
+        profiler.start()
+        blocks = await monitor_loop_lag(profiler, seconds)
+    finally:
+        profiler.stop()
+        active_profiler = None
+    logger.info(f"⏱️ Profilage terminé : {profiler.samples} échantillons, {len(blocks)} callbacks lents")
+
+    samples = max(profiler.samples, 1)
+    lines = [f"{'propre':>7} {'cumulé':>7}  fonction", f"{profiler.idle / samples:>7.1%} {'':>7}  (boucle en attente)"]
+    for func, own, total in profiler.hot_functions():
+        lines.append(f"{own / samples:>7.1%} {total / samples:>7.1%}  {func}")
+    report = "\n".join(lines)
+    if blocks:
+        report += f"\n\nCallbacks bloquants (> {PROFILE_SLOW_CALLBACK * 1000:.0f} ms) :\n"
+        report += "\n".join(f"{lag * 1000:.0f} ms : {stack or '?'}" for lag, stack in blocks)
+
+    def leaf(stack: Optional[str]) -> str:
+        return " ← ".join(reversed(stack.split(";")[-3:])) if stack else "pile inconnue"
+
+    embed = discord.Embed(
+        title=f"⏱️ Profil ({seconds}s, {profiler.samples} échantillons)",
+        description="```\n" + "\n".join(lines[:17])[:3900] + "\n```",
+        color=discord.Color.orange()
+    )
+    embed.add_field(
+        name=f"🐢 Callbacks bloquants (> {PROFILE_SLOW_CALLBACK * 1000:.0f} ms)",
+        value="\n".join(f"• {lag * 1000:.0f} ms : {leaf(stack)[:150]}" for lag, stack in blocks[:5])[:1000] or "Aucun",
+        inline=False
+    )
+    files = [
+        discord.File(io.BytesIO(report.encode("utf-8")), filename="profile.txt"),
+        discord.File(io.BytesIO(profiler.collapsed().encode("utf-8")), filename="profile.collapsed"),
+    ]
+    await interaction.followup.send(embed=embed, files=files, ephemeral=EPHEMERAL_GLOBAL)
+
+# --------- Mémoire ---------
+def deep_sizeof(obj, seen: set = None) -> int:
+    """Taille approximative en octets d'un objet et de tout ce qu'il contient"""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, "__slots__"):
+        size += sum(deep_sizeof(getattr(obj, slot), seen) for slot in obj.__slots__ if hasattr(obj, slot))
+    elif hasattr(obj, "__dict__") and not callable(obj):
+        size += deep_sizeof(vars(obj), seen)
+    return size
+
+def process_rss() -> tuple:
+    """(octets, libellé) : RSS actuelle via /proc, sinon pic de RSS via resource, sinon (None, libellé)"""
+    try:
+        with open("/proc/self/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024, "RSS processus"
+    except OSError:
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss est en octets sous macOS, en Kio ailleurs
+        return (peak if sys.platform == "darwin" else peak * 1024), "RSS processus (pic)"
+    except (ImportError, OSError):
+        return None, "RSS processus"
+
+def format_bytes(size: int) -> str:
+    for unit in ("o", "Kio", "Mio"):
+        if size < 1024:
+            return f"{size:.0f} {unit}"
+        size /= 1024
+    return f"{size:.1f} Gio"
+
+@bot.tree.command(name="memory", description="Affiche l'utilisation mémoire du bot (admin)")
+async def memory_command(interaction: discord.Interaction):
+    user = interaction.user
+    name = interaction.command.name
+    logger.info(f"L'utilisateur {user} a exécuté la commande {name}")
+    if not is_admin(interaction):
+        await interaction.response.send_message("permission_denied", ephemeral=EPHEMERAL_GLOBAL
+)
+        return
 
+    structures = {
+        "custom_commands": custom_commands,
+        "command_cooldowns": command_cooldowns,
+        "warns_data": warns_data,
+        "user_preferences": lang_manager.user_preferences,
+        "translations": lang_manager.translations,
+        "user_activity": user_activity.entries,
+        "channel_activity": channel_activity.entries,
+        "automod": automod.automaton,
+    }
+    lines = []
+    for label, obj in structures.items():
+        count = len(obj)
+        lines.append(f"{label:<18} {count:>8} {format_bytes(deep_sizeof(obj)):>10}")
+
+    rss, rss_label = process_rss()
+    embed = discord.Embed(title="🧠 Mémoire du bot", color=discord.Color.blue())
+    embed.description = "```\n" + f"{'structure':<18} {'entrées':>8} {'taille':>10}\n" + "\n".join(lines) + "\n```"
+    embed.add_field(name=rss_label, value=format_bytes(rss) if rss is not None else "N/A", inline=True)
+    embed.add_field(name="Messages en cache", value=str(len(bot.cached_messages)), inline=True)
+    embed.add_field(name="Membres en cache", value=str(sum(len(g.members) for g in bot.guilds)), inline=True)
+    embed.add_field(name="Utilisateurs en cache", value=str(len(bot.users)), inline=True)
+    embed.add_field(name="Mode basse mémoire", value="✅" if LOW_MEMORY else "❌", inline=True)
+    await interaction.response.send_message(embed=embed, ephemeral=EPHEMERAL_GLOBAL)
 
 @bot.tree.command(name="ephemeral", description="Active ou désactive les messages éphémères")
 @app_commands.describe(option="true pour activer, false pour désactiver")
@@ -776,4 +1693,7 @@ async def ephemeral_command(interaction: discord.Interaction, option: bool):
 # LANCEMENT DU BOT
 # ========================================
 if __name__ == "__main__":
-    bot.run(DISCORD_TOKEN)
\ No newline at end of file
+    if BENCH_AUTOMOD:
+        benchmark_automod()
+    else:
+        bot.run(DISCORD_TOKEN)
\ No newline at end of file